@@ -3,202 +3,52 @@
 Streamlit app: Draft legislation from PolicyEngine code or plain‑English policy instructions using OpenAI o3.
 
 How to run locally:
-1. pip install streamlit openai python-dotenv policyengine_us pyyaml
+1. pip install streamlit openai python-dotenv policyengine_us pyyaml diskcache httpx
 2. export OPENAI_API_KEY="your_key" # or add to a .env file
 3. streamlit run app.py
 """
+import itertools
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 import streamlit as st
-from openai import OpenAI, OpenAIError
+from openai import DefaultHttpxClient, OpenAI, OpenAIError
 
 # Import our custom modules
-from policy_parser import extract_reform_dict_from_code, parse_policy_reform, format_date_values, get_parameter_info
-from policy_text_generator import generate_policy_text
-
-def format_bill_text_html(bill_text):
-    """
-    Format the generated bill text as HTML with enhanced styling.
-    
-    Args:
-        bill_text (str): The raw bill text from the LLM
-        
-    Returns:
-        str: HTML-formatted bill text with line numbers and proper styling
-    """
-    # Split the text into lines
-    lines = bill_text.split('\n')
-    
-    # Create HTML with line numbers and styling
-    html_lines = []
-    line_number = 1
-    
-    for line in lines:
-        # Skip empty lines for line numbering but keep them in the output
-        if line.strip():
-            processed_line = line
-            
-            # Handle various ways deletions might be formatted
-            # Pattern 1: "striking "X"" - Standard legislative language
-            if "striking " in processed_line and '"' in processed_line:
-                parts = processed_line.split('striking "')
-                if len(parts) > 1:
-                    for i in range(1, len(parts)):
-                        if '"' in parts[i]:
-                            end_quote_pos = parts[i].find('"')
-                            if end_quote_pos > 0:
-                                deleted_text = parts[i][:end_quote_pos]
-                                parts[i] = f'<span style="color:#990000; background-color:#ffe6e6; text-decoration:line-through;">"{deleted_text}"</span>' + parts[i][end_quote_pos + 1:]
-                    processed_line = 'striking '.join(parts)
-            
-            # Pattern 2: [~~deletion~~] - Our markdown format
-            while "[~~" in processed_line and "~~]" in processed_line:
-                start_pos = processed_line.find("[~~")
-                if start_pos >= 0:
-                    end_pos = processed_line.find("~~]", start_pos)
-                    if end_pos >= 0:
-                        content = processed_line[start_pos + 3:end_pos]
-                        processed_line = processed_line[:start_pos] + \
-                                        f'<span style="color:#990000; background-color:#ffe6e6; text-decoration:line-through;">{content}</span>' + \
-                                        processed_line[end_pos + 3:]
-                    else:
-                        break
-                else:
-                    break
-                    
-            # Handle additions
-            # Pattern 1: "inserting "X"" - Standard legislative language
-            if "inserting " in processed_line and '"' in processed_line:
-                parts = processed_line.split('inserting "')
-                if len(parts) > 1:
-                    for i in range(1, len(parts)):
-                        if '"' in parts[i]:
-                            end_quote_pos = parts[i].find('"')
-                            if end_quote_pos > 0:
-                                inserted_text = parts[i][:end_quote_pos]
-                                parts[i] = f'<span style="color:#006600; background-color:#e6ffe6; text-decoration:underline; font-weight:bold;">"{inserted_text}"</span>' + parts[i][end_quote_pos + 1:]
-                    processed_line = 'inserting '.join(parts)
-                    
-            # Pattern 2: __addition__ - Our markdown format
-            while "__" in processed_line:
-                start_pos = processed_line.find("__")
-                if start_pos >= 0:
-                    end_pos = processed_line.find("__", start_pos + 2)
-                    if end_pos >= 0:
-                        content = processed_line[start_pos + 2:end_pos]
-                        processed_line = processed_line[:start_pos] + \
-                                        f'<span style="color:#006600; background-color:#e6ffe6; text-decoration:underline; font-weight:bold;">{content}</span>' + \
-                                        processed_line[end_pos + 2:]
-                    else:
-                        break
-                else:
-                    break
-            
-            # Check for section headers and apply special styling
-            if 'SECTION' in processed_line and ':' in processed_line:
-                html_lines.append(f'<div style="display:flex; line-height:1.6; margin-bottom:2px; font-weight:bold; margin-top:15px; margin-bottom:10px;"><span style="color:#888; text-align:right; padding-right:10px; width:30px; flex-shrink:0; user-select:none;">{line_number}</span><span style="flex-grow:1; white-space:pre-wrap; word-wrap:break-word;">{processed_line}</span></div>')
-            # Check for enacting clause
-            elif 'Be it enacted' in processed_line:
-                html_lines.append(f'<div style="display:flex; line-height:1.6; margin-bottom:2px; font-style:italic; margin:15px 0;"><span style="color:#888; text-align:right; padding-right:10px; width:30px; flex-shrink:0; user-select:none;">{line_number}</span><span style="flex-grow:1; white-space:pre-wrap; word-wrap:break-word;">{processed_line}</span></div>')
-            else:
-                html_lines.append(f'<div style="display:flex; line-height:1.6; margin-bottom:2px;"><span style="color:#888; text-align:right; padding-right:10px; width:30px; flex-shrink:0; user-select:none;">{line_number}</span><span style="flex-grow:1; white-space:pre-wrap; word-wrap:break-word;">{processed_line}</span></div>')
-            
-            line_number += 1
-        else:
-            html_lines.append(f'<div style="display:flex; line-height:1.6; margin-bottom:2px;"><span style="color:#888; text-align:right; padding-right:10px; width:30px; flex-shrink:0; user-select:none;"></span><span style="flex-grow:1; white-space:pre-wrap; word-wrap:break-word;">&nbsp;</span></div>')
-    
-    # Join the lines and wrap in a container
-    html_content = f'''
-    <div style="font-family:'Courier New', monospace; background-color:#f9f9f9; border:1px solid #ddd; border-radius:4px; padding:20px; margin:10px 0; box-shadow:0 2px 4px rgba(0,0,0,0.1); max-height:600px; overflow-y:auto; position:relative;">
-        {''.join(html_lines)}
-    </div>
-    '''
-    
-    return html_content
-
-# Custom CSS for the bill display
-bill_css = """
-<style>
-    .bill-container {
-        font-family: 'Courier New', monospace;
-        background-color: #f9f9f9;
-        border: 1px solid #ddd;
-        border-radius: 4px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        max-height: 600px;
-        overflow-y: auto;
-        position: relative;
-    }
-    
-    .bill-header {
-        text-align: center;
-        margin-bottom: 20px;
-    }
-    
-    .bill-title {
-        font-size: 1.2em;
-        font-weight: bold;
-        margin-bottom: 10px;
-    }
-    
-    .bill-line {
-        display: flex;
-        line-height: 1.6;
-        margin-bottom: 2px;
-    }
-    
-    .line-number {
-        color: #888;
-        text-align: right;
-        padding-right: 10px;
-        width: 30px;
-        flex-shrink: 0;
-        user-select: none;
-    }
-    
-    .line-content {
-        flex-grow: 1;
-        white-space: pre-wrap;
-        word-wrap: break-word;
-    }
-    
-    .bill-addition {
-        background-color: #e6ffe6;
-        text-decoration: underline;
-        color: #006600;
-        font-weight: bold;
-    }
-    
-    .bill-deletion {
-        background-color: #ffe6e6;
-        text-decoration: line-through;
-        color: #990000;
-    }
-    
-    .section-header {
-        font-weight: bold;
-        margin-top: 15px;
-        margin-bottom: 10px;
-    }
-    
-    .enacting-clause {
-        font-style: italic;
-        margin: 15px 0;
-    }
-    
-    @media print {
-        .bill-container {
-            box-shadow: none;
-            border: none;
-            max-height: none;
-        }
-    }
-</style>
-"""
+import llm_cache
+from policy_parser import (
+    extract_reform_dict_from_code, parse_policy_reform, format_json, get_parameter_info, load_parameter_info,
+)
+from policy_text_generator import generate_policy_text, generate_parameter_context
+from bill_formatter import bill_css_min, format_bill_text_html
 
 # ------- Configuration -------
 MODEL_NAME = "o4-mini"  # OpenAI reasoning model
+BILL_RENDER_INTERVAL = 0.25  # Seconds between re-renders while the bill streams in
+PARAMETER_LOOKUP_WORKERS = 8  # Threads used to load parameter metadata
+MAX_CONCURRENT_DRAFTS = 5  # In-flight requests when drafting one section per parameter
+OPENAI_MAX_RETRIES = 5  # Retries for transient API failures before surfacing an error
+OPENAI_TIMEOUT = 120  # Seconds; reasoning models can pause this long before streaming
+MAX_COMPLETION_TOKENS = 8000  # Default cap on generated tokens, reasoning tokens included
+
+# Parameters commonly changed in reforms; their metadata is loaded in the background at startup.
+# Each path must map to its own YAML file under get_parameter_info's path rule.
+POPULAR_PARAMETERS = [
+    "gov.irs.credits.ctc.amount.base[0].amount",
+    "gov.irs.credits.ctc.refundable.individual_max",
+    "gov.irs.credits.ctc.phase_out.threshold",
+    "gov.irs.credits.eitc.max[0].amount",
+    "gov.irs.credits.eitc.phase_in_rate[0].amount",
+    "gov.irs.credits.eitc.phase_out.rate[0].amount",
+    "gov.irs.credits.eitc.eligibility.age.min",
+    "gov.irs.credits.eitc.eligibility.age.min_student",
+    "gov.irs.credits.eitc.phase_out.max_investment_income",
+    "gov.usda.snap.expected_contribution",
+    "gov.ssa.ssi.amount.individual",
+]
 
 # Define enhanced system prompt for bill generation
 BILL_SYSTEM_PROMPT = """
@@ -233,13 +83,314 @@ Use proper legislative language conventions:
 Write concise, legally-sound statutory language that is narrowly tailored to the described policy change.
 """
 
+# System prompt for per-parameter drafting. Each request writes one numbered section;
+# the bill designation, title and enacting clause are added once, by BILL_SECTIONS_HEADER
+BILL_SECTION_SYSTEM_PROMPT = """
+You are a professional legislative counsel with expertise in drafting US federal legislation. Your task is to draft one section of a bill whose other sections are drafted separately.
+
+Do not include a bill designation, title, or enacting clause; these are supplied once for the whole bill.
+
+Begin with the section heading in the form "SECTION <number>: <DESCRIPTIVE HEADING>" (capitalized), using the section number given in the request, and number any subsections within it.
+
+When amending existing law:
+- Use proper amendatory language ("Section X of Y is amended by...")
+- Place new text in quotation marks
+- For additions, use underline notation (represent this as __new text__ in markdown)
+- For deletions, use brackets and strikethrough notation (represent this as [~~deleted text~~] in markdown)
+
+Include the effective date of the change as the final subsection of the section.
+
+Use proper legislative language conventions:
+- Write in the present tense
+- Use "shall" for mandatory actions
+- Use "may" for discretionary actions
+- Be precise and unambiguous
+- Use active voice
+- Avoid abbreviations
+
+Write concise, legally-sound statutory language that is narrowly tailored to the described policy change.
+"""
+
+# Opening of a bill assembled from separately drafted sections
+BILL_SECTIONS_HEADER = (
+    "H.R. ____\n\n"
+    "A BILL\n\n"
+    "To amend Federal law to make the policy changes set out in the following sections.\n\n"
+    "Be it enacted by the Senate and House of Representatives of the United States of America in Congress assembled,"
+)
+
+# Static opening of every user message. Keeping the system prompt and this preamble
+# identical across requests, with all run-specific text after them, lets the API
+# reuse its prompt cache for the shared prefix.
+BILL_USER_PREAMBLE = "Draft legislation that implements the following policy change:"
+BILL_SECTION_PREAMBLE = "Draft one section of a bill that implements the following policy change:"
+
+@st.cache_resource(show_spinner=False)
+def get_client():
+    """
+    Create the OpenAI client once per server process so its connection pool
+    stays warm across Streamlit reruns.
+    
+    Returns:
+        OpenAI: The shared OpenAI client
+    """
+    # The SDK retries rate limits, connection errors and timeouts itself with exponential backoff
+    return OpenAI(
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=OPENAI_TIMEOUT,
+        # DefaultHttpxClient keeps the SDK's own client settings and changes only the pool limits
+        http_client=DefaultHttpxClient(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)),
+    )
+
+
 # Initialize OpenAI client
-client = OpenAI()
+client = get_client()
+
+
+@st.cache_resource(show_spinner=False)
+def init_llm_cache():
+    """
+    Open the on-disk completion cache once per server process.
+
+    Returns:
+        diskcache.Cache: The shared completion cache
+    """
+    return llm_cache.get_cache()
+
+
+@llm_cache.cached_completion
+def draft_bill(system_prompt, user_prompt, model, max_completion_tokens=MAX_COMPLETION_TOKENS):
+    """
+    Ask the model to draft bill text, reusing a cached draft for identical prompts.
+
+    Args:
+        system_prompt (str): The system prompt with drafting instructions
+        user_prompt (str): The user prompt describing the policy change
+        model (str): The OpenAI model name
+        max_completion_tokens (int): Upper bound on generated tokens, which bounds latency
+
+    Returns:
+        generator: Chunks of generated bill text as they stream in, returning the
+        finish reason once the stream ends
+    """
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        max_completion_tokens=max_completion_tokens,
+        stream=True,
+    )
+    return stream_completion_text(stream)
+
+
+def stream_completion_text(stream):
+    """
+    Yield the text of a streamed chat completion.
+
+    Args:
+        stream: The streamed chat completion chunks
+
+    Yields:
+        str: Each non-empty piece of generated text
+
+    Returns:
+        str or None: The finish reason, e.g. "length" if the token limit was reached
+    """
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            yield choice.delta.content
+        finish_reason = choice.finish_reason or finish_reason
+    return finish_reason
+
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache():
+    """
+    Load the near-duplicate prompt cache once per server process.
+
+    Only called when "Reuse drafts for similar prompts" is ticked, so numpy and the
+    index file are not loaded otherwise.
+
+    Returns:
+        SemanticCache: The shared semantic cache
+    """
+    from semantic_cache import SemanticCache
+    return SemanticCache(client)
+
+
+def draft_bill_sections(user_prompts, bypass_cache=False, max_completion_tokens=MAX_COMPLETION_TOKENS):
+    """
+    Draft a bill with one section per prompt, with up to MAX_CONCURRENT_DRAFTS requests in flight.
+    
+    Each prompt must say which section number it is drafting. The sections are
+    placed under BILL_SECTIONS_HEADER, so the result reads as a single bill. All
+    requests are started before this function returns.
+    
+    Args:
+        user_prompts (list): User prompts, one per section, in section order
+        bypass_cache (bool): Whether to request fresh drafts instead of reusing cached ones
+        max_completion_tokens (int): Upper bound on generated tokens for each section
+        
+    Returns:
+        iterator: The bill header, then each drafted section in order once it is complete
+    """
+    def draft_section(user_prompt):
+        bill_chunks = draft_bill(
+            BILL_SECTION_SYSTEM_PROMPT, user_prompt, MODEL_NAME,
+            bypass_cache=bypass_cache, max_completion_tokens=max_completion_tokens,
+        )
+        return "".join(bill_chunks).strip()
+    
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DRAFTS)
+    section_futures = [executor.submit(draft_section, user_prompt) for user_prompt in user_prompts]
+    # Let the worker threads exit on their own once the last section is drafted
+    executor.shutdown(wait=False)
+    
+    return itertools.chain(
+        [BILL_SECTIONS_HEADER],
+        ("\n\n" + future.result() for future in section_futures),
+    )
+
+
+def render_bill_stream(chunks):
+    """
+    Display streamed bill text as it arrives, re-rendering at most every
+    BILL_RENDER_INTERVAL seconds since formatting walks every line of the bill.
+
+    Args:
+        chunks (iterable): Chunks of bill text
+
+    Returns:
+        str: The complete bill text
+    """
+    st.subheader("Generated Bill")
+    st.markdown(bill_css_min, unsafe_allow_html=True)
+    placeholder = st.empty()
+
+    parts = []
+    last_render = 0.0
+    for chunk in chunks:
+        parts.append(chunk)
+        now = time.monotonic()
+        if now - last_render >= BILL_RENDER_INTERVAL:
+            placeholder.markdown(format_bill_text_html("".join(parts)), unsafe_allow_html=True)
+            last_render = now
+
+    bill_text = "".join(parts).strip()
+    placeholder.markdown(format_bill_text_html(bill_text), unsafe_allow_html=True)
+    return bill_text
+
+
+def fetch_parameter_info(param_paths, loader=get_parameter_info):
+    """
+    Load PolicyEngine parameter information for several parameters concurrently.
+    
+    Args:
+        param_paths (list): Parameter paths from the reform dict
+        loader (callable): get_parameter_info, or load_parameter_info to raise on read errors
+        
+    Returns:
+        dict: Parameter information keyed by parameter path
+    """
+    with ThreadPoolExecutor(max_workers=PARAMETER_LOOKUP_WORKERS) as executor:
+        return dict(zip(param_paths, executor.map(loader, param_paths)))
+
+
+@st.cache_resource(show_spinner=False)
+def start_parameter_prewarm():
+    """
+    Load the metadata of POPULAR_PARAMETERS on a background thread, once per server
+    process, so the first reform using them does not wait on the policyengine_us
+    import and YAML reads.
+    
+    Returns:
+        threading.Thread: The prewarm thread
+    """
+    thread = threading.Thread(target=fetch_parameter_info, args=(POPULAR_PARAMETERS,), daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_data(show_spinner=False)
+def analyze_reform_code(policy_code):
+    """
+    Extract, parse and describe the reform in PolicyEngine code, cached across reruns.
+    
+    Args:
+        policy_code (str): PolicyEngine Python code containing a reform definition
+        
+    Returns:
+        tuple: The parsed reform information and its plain English description
+    """
+    # Extract the reform dictionary from the Python code
+    reform_dict = extract_reform_dict_from_code(policy_code)
+    
+    # Load every parameter's metadata up front in parallel; later lookups hit the cache.
+    # load_parameter_info raises on a transient read failure instead of falling back,
+    # so a placeholder description is never cached here and the next click retries
+    fetch_parameter_info(list(reform_dict), loader=load_parameter_info)
+    
+    # Parse the reform and generate text description
+    reform_info = parse_policy_reform(reform_dict)
+    return reform_info, generate_policy_text(reform_info)
+
+
+@st.cache_data(show_spinner=False)
+def build_enhanced_context(reform_changes):
+    """
+    Build the parameter context appended to the bill-drafting prompt, cached across reruns.
+    
+    Args:
+        reform_changes (tuple): (parameter, new_value, start_date, end_date) for each reform item
+        
+    Returns:
+        str: Context describing each modified parameter and its proposed change
+    """
+    enhanced_context_parts = [generate_parameter_context(*reform_change) for reform_change in reform_changes]
+    return "Here is additional context about the parameters being modified:\n\n" + "".join(enhanced_context_parts)
+
+
+init_llm_cache()
+start_parameter_prewarm()
 
 # ------- Streamlit UI -------
 st.set_page_config(page_title="Legislation Drafter", page_icon="📜", layout="centered")
 st.title("📜 Legislative Drafting Assistant")
 
+bypass_cache = st.sidebar.checkbox(
+    "Bypass cache",
+    help="Request a fresh draft even if an identical prompt was drafted before.",
+)
+max_completion_tokens = st.sidebar.number_input(
+    "Max completion tokens",
+    min_value=1000,
+    max_value=100000,
+    value=MAX_COMPLETION_TOKENS,
+    step=1000,
+    help="Upper bound on tokens the model may generate, including its hidden reasoning.",
+)
+per_parameter_drafting = st.sidebar.checkbox(
+    "Per-parameter drafting",
+    help="For PolicyEngine code, draft a separate section for each parameter change in parallel.",
+)
+reuse_similar_drafts = st.sidebar.checkbox(
+    "Reuse drafts for similar prompts",
+    help="Return an earlier draft when a new prompt is nearly identical and mentions the same numbers.",
+)
+bill_drafter = draft_bill
+if reuse_similar_drafts:
+    try:
+        # Variant of draft_bill that also reuses drafts written for near-duplicate prompts
+        bill_drafter = get_semantic_cache().wrap(draft_bill)
+    except Exception as e:
+        st.sidebar.warning(f"Could not load the similar-draft cache, so only identical prompts are reused: {e}")
+
 # Create tabs for different input methods
 tab1, tab2 = st.tabs(["PolicyEngine Code", "Plain English"])
 
@@ -287,12 +438,10 @@ with tab1:
             st.stop()
         
         try:
-            # Extract the reform dictionary from the Python code
-            reform_dict = extract_reform_dict_from_code(policy_code)
-            
             # Parse the reform and generate text description
-            reform_info = parse_policy_reform(reform_dict)
-            policy_text = generate_policy_text(reform_info)
+            reform_info, policy_text = analyze_reform_code(policy_code)
+            # analyze_reform_code already loaded every parameter, so these are cache hits
+            param_infos = {r["parameter"]: get_parameter_info(r["parameter"]) for r in reform_info}
             
             # Display the generated text
             st.subheader("Generated Policy Text")
@@ -302,116 +451,89 @@ with tab1:
             st.session_state.policy_instruction = policy_text
             st.session_state.reform_info = reform_info
             
-            # Display collapsible sections with parameter details
-            st.subheader("Parameter Details")
-            for index, reform_item in enumerate(reform_info):
-                param_path = reform_item["parameter"]
-                with st.expander(f"Parameter: {param_path}"):
-                    # Get the full parameter info from policyengine
-                    param_info = get_parameter_info(param_path)
-                    
-                    # Display description
-                    if "description" in param_info:
-                        st.markdown(f"**Description:** {param_info['description']}")
-                    
-                    # Display values/brackets if available using json-safe values
-                    if "brackets" in param_info:
-                        st.markdown("**Brackets:**")
-                        for bracket in param_info["brackets"]:
-                            # Convert date objects to strings for JSON serialization
-                            bracket_safe = format_date_values(bracket)
-                            st.json(bracket_safe)
-                    elif "values" in param_info:
-                        st.markdown("**Values:**")
-                        values_safe = format_date_values(param_info["values"])
-                        st.json(values_safe)
-                    
-                    # Display metadata if available
-                    if "metadata" in param_info:
-                        st.markdown("**Metadata:**")
-                        st.json(param_info["metadata"])
-                    
-                    # Display references if available
-                    if "metadata" in param_info and "reference" in param_info["metadata"]:
-                        st.markdown("**References:**")
-                        for ref in param_info["metadata"]["reference"]:
-                            if "href" in ref and "title" in ref:
-                                st.markdown(f"- [{ref['title']}]({ref['href']})")
-                            else:
-                                st.json(ref)
-            
-            # Get the enhanced context from policy reform information
-            enhanced_context = "Here is additional context about the parameters being modified:\n\n"
-            
-            for reform_item in reform_info:
-                param_path = reform_item["parameter"]
-                param_info = get_parameter_info(param_path)
-                
-                # Add parameter path and description
-                enhanced_context += f"Parameter: {param_path}\n"
-                if "description" in param_info:
-                    enhanced_context += f"Description: {param_info['description']}\n"
-                
-                # Add current values information
-                if "brackets" in param_info:
-                    enhanced_context += "Current brackets:\n"
-                    for bracket in param_info["brackets"]:
-                        # Convert date objects to strings in thresholds and amounts
-                        threshold_str = str(format_date_values(bracket.get('threshold', {})))
-                        amount_str = str(format_date_values(bracket.get('amount', {})))
-                        enhanced_context += f"- Threshold: {threshold_str}\n"
-                        enhanced_context += f"  Amount: {amount_str}\n"
-                elif "values" in param_info:
-                    # Convert date objects to strings in values
-                    values_str = str(format_date_values(param_info['values']))
-                    enhanced_context += f"Current values: {values_str}\n"
-                
-                # Add metadata
-                if "metadata" in param_info and "type" in param_info["metadata"]:
-                    enhanced_context += f"Type: {param_info['metadata']['type']}\n"
-                
-                # Add references
-                if "metadata" in param_info and "reference" in param_info["metadata"]:
-                    enhanced_context += "Legal references:\n"
-                    for ref in param_info["metadata"]["reference"]:
-                        if "title" in ref:
-                            enhanced_context += f"- {ref['title']}"
-                            if "href" in ref:
-                                enhanced_context += f" ({ref['href']})"
-                            enhanced_context += "\n"
-                
-                # Add proposed change
-                enhanced_context += f"Proposed change: {reform_item['new_value']} (effective {reform_item['start_date']} to {reform_item['end_date']})\n\n"
+            reform_changes = tuple(
+                (r["parameter"], r["new_value"], r["start_date"], r["end_date"]) for r in reform_info
+            )
             
             # Build the system + user prompt
             system_prompt = BILL_SYSTEM_PROMPT
             
-            user_prompt = f"Draft legislation that implements the following policy change:\n\n{policy_text}\n\n{enhanced_context}"
+            if per_parameter_drafting:
+                # One prompt per reform item, each carrying only its own parameter context
+                # and the number of the section it drafts
+                section_prompts = [
+                    f"{BILL_SECTION_PREAMBLE}\n\n{generate_policy_text([reform_item])}\n\n"
+                    f"{build_enhanced_context((reform_change,))}Draft this as SECTION {section_number}."
+                    for section_number, (reform_item, reform_change) in enumerate(zip(reform_info, reform_changes), 1)
+                ]
+            else:
+                # Get the enhanced context from policy reform information
+                enhanced_context = build_enhanced_context(reform_changes)
+                user_prompt = f"{BILL_USER_PREAMBLE}\n\n{policy_text}\n\n{enhanced_context}"
             
-            with st.spinner("Drafting bill..."):
-                try:
-                    response = client.chat.completions.create(
-                        model=MODEL_NAME,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
+            # Start drafting in the background so the request is in flight while
+            # the parameter details below are fetched and rendered
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                if per_parameter_drafting:
+                    bill_future = executor.submit(
+                        draft_bill_sections, section_prompts,
+                        bypass_cache=bypass_cache, max_completion_tokens=max_completion_tokens,
+                    )
+                else:
+                    bill_future = executor.submit(
+                        bill_drafter, system_prompt, user_prompt, MODEL_NAME,
+                        bypass_cache=bypass_cache, max_completion_tokens=max_completion_tokens,
                     )
-                    bill_text = response.choices[0].message.content.strip()
+                
+                # Display collapsible sections with parameter details
+                st.subheader("Parameter Details")
+                for index, reform_item in enumerate(reform_info):
+                    param_path = reform_item["parameter"]
+                    with st.expander(f"Parameter: {param_path}"):
+                        # Get the full parameter info from policyengine
+                        param_info = param_infos[param_path]
+                    
+                        # Display description
+                        if "description" in param_info:
+                            st.markdown(f"**Description:** {param_info['description']}")
                     
-                    # Display the bill with enhanced styling
-                    st.subheader("Generated Bill")
-                    st.markdown(bill_css, unsafe_allow_html=True)
-                    st.markdown(format_bill_text_html(bill_text), unsafe_allow_html=True)
+                        # Display values/brackets if available using json-safe values
+                        if "brackets" in param_info:
+                            st.markdown("**Brackets:**")
+                            for bracket in param_info["brackets"]:
+                                # Serialize with date objects converted to strings
+                                st.json(format_json(bracket))
+                        elif "values" in param_info:
+                            st.markdown("**Values:**")
+                            st.json(format_json(param_info["values"]))
                     
-                    # Also keep the plain text version for copying
-                    with st.expander("Show plain text version (for copying)"):
-                        st.code(bill_text, language="markdown")
+                        # Display metadata if available
+                        if "metadata" in param_info:
+                            st.markdown("**Metadata:**")
+                            st.json(param_info["metadata"])
+                    
+                        # Display references if available
+                        if "metadata" in param_info and "reference" in param_info["metadata"]:
+                            st.markdown("**References:**")
+                            for ref in param_info["metadata"]["reference"]:
+                                if "href" in ref and "title" in ref:
+                                    st.markdown(f"- [{ref['title']}]({ref['href']})")
+                                else:
+                                    st.json(ref)
+            
+                with st.spinner("Drafting bill..."):
+                    try:
+                        # Display the bill with enhanced styling as it streams in
+                        bill_text = render_bill_stream(bill_future.result())
+                    
+                        # Also keep the plain text version for copying
+                        with st.expander("Show plain text version (for copying)"):
+                            st.code(bill_text, language="markdown")
                         
-                except OpenAIError as e:
-                    st.error(f"OpenAI API error: {e}")
-                except Exception as e:
-                    st.error(f"Unexpected error: {e}")
+                    except OpenAIError as e:
+                        st.error(f"OpenAI API error: {e}")
+                    except Exception as e:
+                        st.error(f"Unexpected error: {e}")
                 
         except ValueError as e:
             st.error(f"Error extracting reform: {str(e)}")
@@ -445,23 +567,17 @@ with tab2:
         # Build the system + user prompt
         system_prompt = BILL_SYSTEM_PROMPT
         
-        user_prompt = f"Draft legislation that implements the following policy change:\n\n{policy_instruction.strip()}"
+        user_prompt = f"{BILL_USER_PREAMBLE}\n\n{policy_instruction.strip()}"
         
         with st.spinner("Drafting bill..."):
             try:
-                response = client.chat.completions.create(
-                    model=MODEL_NAME,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
+                # Display the bill with enhanced styling as it streams in
+                bill_text = render_bill_stream(
+                    bill_drafter(
+                        system_prompt, user_prompt, MODEL_NAME,
+                        bypass_cache=bypass_cache, max_completion_tokens=max_completion_tokens,
+                    )
                 )
-                bill_text = response.choices[0].message.content.strip()
-                
-                # Display the bill with enhanced styling
-                st.subheader("Generated Bill")
-                st.markdown(bill_css, unsafe_allow_html=True)
-                st.markdown(format_bill_text_html(bill_text), unsafe_allow_html=True)
                 
                 # Also keep the plain text version for copying
                 with st.expander("Show plain text version (for copying)"):
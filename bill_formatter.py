@@ -0,0 +1,144 @@
+# bill_formatter.py
+"""
+Functions for rendering generated bill text as styled HTML.
+"""
+import functools
+import re
+
+# Precompiled patterns for the amendment markup produced by the model
+_STRIKING_RE = re.compile(r'striking "([^"]+)"')
+_INSERTING_RE = re.compile(r'inserting "([^"]+)"')
+_DELETION_RE = re.compile(r'\[~~(.*?)~~\]')
+_ADDITION_RE = re.compile(r'__(.*?)__')
+_SECTION_HEADER_RE = re.compile(r'SECTION[^:]*:')
+
+# HTML for a single numbered line; the classes are styled by bill_css
+_BILL_LINE_HTML = '<div class="bill-line{extra_class}"><span class="line-number">{number}</span><span class="line-content">{content}</span></div>'
+
+@functools.lru_cache(maxsize=4096)
+def _format_bill_line(line):
+    """
+    Apply amendment markup and header styling to one non-empty line of bill text.
+    
+    Cached so that re-rendering a streaming bill only formats lines that are new.
+    
+    Args:
+        line (str): A line of raw bill text
+        
+    Returns:
+        tuple: The extra CSS class for the line and its HTML content
+    """
+    # Handle deletions: "striking "X"" legislative language and our [~~X~~] markdown
+    line = _STRIKING_RE.sub(r'striking <span class="bill-deletion">"\1"</span>', line)
+    line = _DELETION_RE.sub(r'<span class="bill-deletion">\1</span>', line)
+    
+    # Handle additions: "inserting "X"" legislative language and our __X__ markdown
+    line = _INSERTING_RE.sub(r'inserting <span class="bill-addition">"\1"</span>', line)
+    line = _ADDITION_RE.sub(r'<span class="bill-addition">\1</span>', line)
+    
+    # Apply special styling to section headers and the enacting clause
+    if _SECTION_HEADER_RE.search(line):
+        return " section-header", line
+    if 'Be it enacted' in line:
+        return " enacting-clause", line
+    return "", line
+
+def format_bill_text_html(bill_text):
+    """
+    Format the generated bill text as HTML with enhanced styling.
+    
+    Args:
+        bill_text (str): The raw bill text from the LLM
+        
+    Returns:
+        str: HTML-formatted bill text with line numbers and proper styling
+    """
+    html_lines = []
+    line_number = 1
+    
+    for line in bill_text.split('\n'):
+        # Skip empty lines for line numbering but keep them in the output
+        if not line.strip():
+            html_lines.append(_BILL_LINE_HTML.format(extra_class="", number="", content="&nbsp;"))
+            continue
+        
+        extra_class, content = _format_bill_line(line)
+        html_lines.append(_BILL_LINE_HTML.format(extra_class=extra_class, number=line_number, content=content))
+        line_number += 1
+    
+    # Join the lines and wrap in a container
+    return f'<div class="bill-container">{"".join(html_lines)}</div>'
+
+# Custom CSS for the bill display
+bill_css = """
+<style>
+    .bill-container {
+        font-family: 'Courier New', monospace;
+        background-color: #f9f9f9;
+        border: 1px solid #ddd;
+        border-radius: 4px;
+        padding: 20px;
+        margin: 10px 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        max-height: 600px;
+        overflow-y: auto;
+        position: relative;
+    }
+    
+    .bill-line {
+        display: flex;
+        line-height: 1.6;
+        margin-bottom: 2px;
+    }
+    
+    .line-number {
+        color: #888;
+        text-align: right;
+        padding-right: 10px;
+        width: 30px;
+        flex-shrink: 0;
+        user-select: none;
+    }
+    
+    .line-content {
+        flex-grow: 1;
+        white-space: pre-wrap;
+        word-wrap: break-word;
+    }
+    
+    .bill-addition {
+        background-color: #e6ffe6;
+        text-decoration: underline;
+        color: #006600;
+        font-weight: bold;
+    }
+    
+    .bill-deletion {
+        background-color: #ffe6e6;
+        text-decoration: line-through;
+        color: #990000;
+    }
+    
+    .section-header {
+        font-weight: bold;
+        margin-top: 15px;
+        margin-bottom: 10px;
+    }
+    
+    .enacting-clause {
+        font-style: italic;
+        margin: 15px 0;
+    }
+    
+    @media print {
+        .bill-container {
+            box-shadow: none;
+            border: none;
+            max-height: none;
+        }
+    }
+</style>
+"""
+
+# Whitespace-collapsed copy of bill_css; this is what gets sent with each rendered bill
+bill_css_min = re.sub(r'\s+', ' ', bill_css).strip()
@@ -0,0 +1,49 @@
+# conftest.py
+"""
+Shared test fixtures: an in-memory completion cache and fake completion streams.
+"""
+import pytest
+
+import llm_cache
+
+
+class StubCache:
+    """
+    In-memory stand-in for diskcache.Cache with the get/set methods llm_cache uses.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+
+@pytest.fixture
+def stub_cache(monkeypatch):
+    """
+    Replace the on-disk completion cache with an empty StubCache.
+    """
+    cache = StubCache()
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+def _stream(chunks, finish_reason="stop"):
+    """
+    Stream text chunks the way draft_bill does, returning the finish reason at the end.
+    """
+    for chunk in chunks:
+        yield chunk
+    return finish_reason
+
+
+@pytest.fixture
+def fake_stream():
+    """
+    Provide a function that builds fake completion streams.
+    """
+    return _stream
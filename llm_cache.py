@@ -0,0 +1,169 @@
+# llm_cache.py
+"""
+On-disk cache for LLM completions, keyed on a hash of the prompts and model name.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+
+from diskcache import Cache
+
+CACHE_DIR = os.path.expanduser("~/.cache/legbuilder")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Get the process-wide completion cache, opening it on first use.
+
+    Returns:
+        diskcache.Cache: The on-disk cache, evicting least-recently-used entries
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = Cache(CACHE_DIR, eviction_policy="least-recently-used")
+        return _cache
+
+
+def make_cache_key(system_prompt, user_prompt, model, **options):
+    """
+    Build the cache key for a completion request.
+
+    Args:
+        system_prompt (str): The system prompt sent to the model
+        user_prompt (str): The user prompt sent to the model
+        model (str): The model name
+        **options: Other request settings that change the output, e.g. token limits
+
+    Returns:
+        str: SHA-256 hex digest identifying the request
+    """
+    key_fields = {"sys": system_prompt, "usr": user_prompt, "model": model}
+    if options:
+        key_fields["options"] = options
+    payload = json.dumps(key_fields, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_completion(system_prompt, user_prompt, model, **options):
+    """
+    Look up a stored completion for an identical request.
+
+    Args:
+        system_prompt (str): The system prompt sent to the model
+        user_prompt (str): The user prompt sent to the model
+        model (str): The model name
+        **options: Other request settings that change the output, e.g. token limits
+
+    Returns:
+        str or None: The cached completion text, or None if there is none
+    """
+    return get_cache().get(make_cache_key(system_prompt, user_prompt, model, **options))
+
+
+def cached_completion(func):
+    """
+    Decorator that caches the text streamed by a completion function.
+
+    The wrapped function must accept (system_prompt, user_prompt, model) plus any
+    keyword options, and return an iterable of text chunks; a generator may return
+    the API's finish reason. Options are passed through and form part of the cache
+    key. The wrapper also returns an iterator of chunks: a cached completion is
+    yielded as a single chunk, while a fresh completion is passed through as it
+    streams and stored once fully consumed, unless it is empty or was cut off.
+    Callers may pass bypass_cache=True to force a fresh completion, which then
+    replaces the cached entry.
+
+    Args:
+        func (callable): The completion function to wrap
+
+    Returns:
+        callable: The caching wrapper
+    """
+    @functools.wraps(func)
+    def wrapper(system_prompt, user_prompt, model, bypass_cache=False, **options):
+        cache = get_cache()
+        key = make_cache_key(system_prompt, user_prompt, model, **options)
+
+        if not bypass_cache:
+            cached_text = cache.get(key)
+            if cached_text is not None:
+                return iter([cached_text])
+
+        # Call the function here rather than inside a generator so the request
+        # is already in flight when the caller starts iterating
+        return _store_when_complete(cache, key, func(system_prompt, user_prompt, model, **options))
+
+    return wrapper
+
+
+def collect_stream(chunks, parts):
+    """
+    Pass text chunks through, recording each one, and return the stream's finish reason.
+
+    Use with "yield from" to get the value returned by a generator of chunks.
+
+    Args:
+        chunks (iterable): The streamed text chunks
+        parts (list): List each chunk is appended to
+
+    Yields:
+        str: Each chunk of text as it arrives
+
+    Returns:
+        str or None: The finish reason returned by chunks, if any
+    """
+    iterator = iter(chunks)
+    while True:
+        try:
+            chunk = next(iterator)
+        except StopIteration as stop:
+            return stop.value
+        parts.append(chunk)
+        yield chunk
+
+
+def is_storable(text, finish_reason):
+    """
+    Check whether a completion is worth reusing.
+
+    An empty completion, or one that stopped at the token limit (which reasoning
+    models can reach before writing any text), would otherwise be served on every
+    later request for the same prompt.
+
+    Args:
+        text (str): The complete completion text
+        finish_reason (str or None): Why the model stopped generating
+
+    Returns:
+        bool: True if the completion should be cached
+    """
+    return bool(text) and finish_reason != "length"
+
+
+def _store_when_complete(cache, key, chunks):
+    """
+    Pass text chunks through and cache the full text once the stream is exhausted.
+
+    Args:
+        cache (diskcache.Cache): The completion cache
+        key (str): The cache key for this completion
+        chunks (iterable): The streamed text chunks
+
+    Yields:
+        str: Each chunk of text as it arrives
+
+    Returns:
+        str or None: The finish reason returned by chunks, if any
+    """
+    parts = []
+    finish_reason = yield from collect_stream(chunks, parts)
+    text = "".join(parts).strip()
+    if is_storable(text, finish_reason):
+        cache.set(key, text)
+    return finish_reason
@@ -4,91 +4,311 @@ Functions for parsing PolicyEngine Python code and extracting parameter informat
 """
 import re
 import ast
+import datetime
+import functools
+import json
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# libyaml's C loader when PyYAML was built with it; same safe subset as yaml.safe_load
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Matches the "[index].field" suffix of a bracket parameter path
+_BRACKET_FIELD_RE = re.compile(r'\[\d+\]\.[\w]+$')
+
+# Opening of the call whose first argument is the reform dictionary
+_REFORM_CALL_PREFIX = "Reform.from_dict("
+
+# Quotes, backslashes and comments, which _scan_code skips over, plus brackets
+_BRACKET_TOKEN_RE = re.compile(r'"""|' r"'''" r'''|["'\\#()\[\]{}]''')
+
+# Quotes, backslashes and comments, which _scan_code skips over, plus the call itself
+_CALL_TOKEN_RE = re.compile(r'"""|' r"'''" r'''|["'\\#]|''' + re.escape(_REFORM_CALL_PREFIX))
+
+
+def _starts_name(source, index):
+    """
+    Check that the text at index is not the tail of a longer identifier.
+    
+    A preceding "." is allowed, so module-qualified calls still match.
+    
+    Args:
+        source (str): Python source code
+        index (int): Position of the candidate name
+        
+    Returns:
+        bool: True if index starts a name
+    """
+    if index == 0:
+        return True
+    previous = source[index - 1]
+    return not (previous.isalnum() or previous == '_')
+
+
+def _closes_string(token, quote):
+    """
+    Check whether a quote token ends the string opened by quote.
+    
+    Args:
+        token (str): A quote token found inside the string
+        quote (str): The quote that opened the string
+        
+    Returns:
+        bool: True if the string ends at this token
+    """
+    # A triple quote also closes a single-quoted string, e.g. the second '"' in '"a"""'
+    return token[0] == quote[0] and len(token) >= len(quote)
+
+
+def _scan_code(source, index, token_re):
+    """
+    Walk the tokens of token_re in source, skipping string literals and comments.
+    
+    Args:
+        source (str): Python source code
+        index (int): Position to start scanning from, outside any string or comment
+        token_re (re.Pattern): Pattern matching quotes, backslashes, "#" and the tokens of interest
+        
+    Yields:
+        re.Match: Each token of interest found outside strings and comments
+    """
+    quote = None
+    while True:
+        match = token_re.search(source, index)
+        if match is None:
+            return
+        token = match.group()
+        index = match.end()
+        if quote:
+            # Inside a string: skip escaped characters and look for the closing quote
+            if token == '\\':
+                index += 1
+            elif token[0] in '"\'' and _closes_string(token, quote):
+                index = match.start() + len(quote)
+                quote = None
+        elif token == '#':
+            # Skip to the end of the comment
+            index = source.find('\n', index)
+            if index < 0:
+                return
+        elif token[0] in '"\'':
+            quote = token
+        elif token != '\\':
+            yield match
+
+
+def _match_call(source, start):
+    """
+    Cut the Reform.from_dict call at start, up to its matching close bracket, out of source.
+    
+    Only the call itself is scanned, jumping from one bracket, quote or comment to the next.
+    
+    Args:
+        source (str): Python source code
+        start (int): Position of the call's _REFORM_CALL_PREFIX
+        
+    Returns:
+        str or None: The call's source text, or None if it is unbalanced
+    """
+    depth = 1
+    for match in _scan_code(source, start + len(_REFORM_CALL_PREFIX), _BRACKET_TOKEN_RE):
+        if match.group() in '([{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return source[start:match.end()]
+    return None
+
+
+def _find_call_outside_strings(source):
+    """
+    Find the first Reform.from_dict call that is not inside a string literal or comment.
+    
+    Scans the whole source, so it is only used when the str.find candidates fail.
+    
+    Args:
+        source (str): Python source code
+        
+    Returns:
+        int or None: Position of the call's _REFORM_CALL_PREFIX, or None if there is none
+    """
+    for match in _scan_code(source, 0, _CALL_TOKEN_RE):
+        if _starts_name(source, match.start()):
+            return match.start()
+    return None
+
+
+def _evaluate_reform_call(call_source):
+    """
+    Evaluate the reform dictionary passed to a Reform.from_dict call, without running any code.
+    
+    Args:
+        call_source (str): Source text of the call, as cut out by _match_call
+        
+    Returns:
+        dict: The reform dictionary
+    """
+    try:
+        call = ast.parse(call_source, mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Could not parse the Reform.from_dict() call: {str(e)}")
+    
+    if not call.args:
+        raise ValueError("Reform.from_dict() was called without a reform dictionary")
+    
+    try:
+        # Evaluate the dict node directly; the source is not parsed a second time
+        reform_dict = ast.literal_eval(call.args[0])
+    except (ValueError, TypeError):
+        reform_dict = None
+    
+    if not isinstance(reform_dict, dict):
+        raise ValueError(
+            "The first argument to Reform.from_dict() must be a literal dict, "
+            "with no variables or function calls in it"
+        )
+    return reform_dict
+
+
 def extract_reform_dict_from_code(code_string):
     """
     Extract the reform dictionary from PolicyEngine Python code.
     
+    The code is only parsed, never run.
+    
     Args:
         code_string (str): Python code containing a reform definition
         
     Returns:
         dict: The reform dictionary
     """
-    # Find the Reform.from_dict() call and extract the dictionary
-    reform_dict_match = re.search(r'Reform\.from_dict\((.*?)(?:,\s*country_id|\))', code_string, re.DOTALL)
-    
-    if not reform_dict_match:
-        raise ValueError("Could not find Reform.from_dict() in the provided code")
+    # Fast path: try each occurrence found by str.find and parse only that call, so the
+    # rest of the code is never scanned and may be incomplete. Occurrences after a "#"
+    # on the same line are most likely commented out, so they are left to the slow path.
+    start = code_string.find(_REFORM_CALL_PREFIX)
+    while start >= 0:
+        line_start = code_string.rfind('\n', 0, start) + 1
+        if _starts_name(code_string, start) and '#' not in code_string[line_start:start]:
+            call_source = _match_call(code_string, start)
+            if call_source is not None:
+                try:
+                    return _evaluate_reform_call(call_source)
+                except ValueError:
+                    pass
+        start = code_string.find(_REFORM_CALL_PREFIX, start + 1)
     
-    # Get the dictionary part from the match
-    reform_dict_str = reform_dict_match.group(1).strip()
-    
-    try:
-        # Try to safely evaluate the dictionary with ast
-        reform_dict = ast.literal_eval(reform_dict_str)
-        return reform_dict
-    except Exception as e:
-        # If parsing fails, try a more flexible approach with a custom parser
-        try:
-            # Extract keys and values manually
-            reform_dict = {}
-            # Find all parameter paths and their values
-            param_matches = re.findall(r'"([^"]+)":\s*{([^{}]+)}\s*,?', reform_dict_str)
-            
-            for param_path, values_str in param_matches:
-                # Extract date range and value
-                value_match = re.search(r'"([^"]+)":\s*(\d+)', values_str)
-                if value_match:
-                    date_range = value_match.group(1)
-                    value = int(value_match.group(2))  # Assuming values are integers
-                    reform_dict[param_path] = {date_range: value}
-            
-            if reform_dict:
-                return reform_dict
-            else:
-                raise ValueError("Could not extract parameters from the reform dictionary")
-        except Exception as e:
-            raise ValueError(f"Could not parse the reform dictionary from the code: {str(e)}")
+    # Slow path: find the first call outside strings and comments, which also gives
+    # the error message when there is no usable call
+    start = _find_call_outside_strings(code_string)
+    call_source = None if start is None else _match_call(code_string, start)
+    if call_source is None:
+        raise ValueError("Could not find a complete Reform.from_dict() call in the provided code")
+    return _evaluate_reform_call(call_source)
 
 
 def get_parameter_info(parameter_path):
     """
     Get parameter information from the PolicyEngine parameter path.
     
+    Parameter files are cached for the life of the process, so the returned dict may
+    be shared between callers and must not be modified.
+    
     Args:
         parameter_path (str): The parameter path from the reform dict
         
     Returns:
         dict: Parameter information including name, description, references
     """
-    # Convert parameter path to file path in policyengine-us repo structure
-    # Example: "gov.irs.credits.ctc.amount.base[0].amount" -> "gov/irs/credits/ctc/amount/base.yaml"
+    try:
+        return load_parameter_info(parameter_path)
+    except Exception:
+        # Errors other than a missing file are not cached, so a transient failure
+        # (e.g. policyengine_us still being imported by another thread) is retried
+        return _fallback_parameter_info(parameter_path)
+
+
+def load_parameter_info(parameter_path):
+    """
+    Get parameter information like get_parameter_info, but raise instead of falling back
+    when the parameter file could not be read.
+    
+    Use this when the result is cached, so that a transient failure is not kept.
+    
+    Args:
+        parameter_path (str): The parameter path from the reform dict
+        
+    Returns:
+        dict: Parameter information, or the basic fallback if there is no parameter file
+    """
+    # Extract the base path without the array index and field, so every bracket
+    # of a parameter shares one cached file
+    base_path = _BRACKET_FIELD_RE.sub('', parameter_path)
+    param_data = _load_parameter_file(base_path)
     
-    # Extract the base path without the array index and field
-    base_path = re.sub(r'\[\d+\]\.[\w]+$', '', parameter_path)
+    if param_data is None:
+        return _fallback_parameter_info(parameter_path)
+    return param_data
+
+
+def _fallback_parameter_info(parameter_path):
+    """
+    Build the basic information used when a parameter file cannot be loaded.
+    
+    Args:
+        parameter_path (str): The parameter path from the reform dict
+        
+    Returns:
+        dict: Parameter information with a generic description and no references
+    """
+    return {
+        "description": f"Parameter at {parameter_path}",
+        "metadata": {
+            "reference": []
+        }
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def _load_parameter_file(base_path):
+    """
+    Load and cache the policyengine-us YAML file for a parameter.
+    
+    Args:
+        base_path (str): Parameter path without any bracket suffix
+        
+    Returns:
+        dict or None: The parsed parameter file, or None if there is no such file
+    """
+    # Convert parameter path to file path in policyengine-us repo structure
+    # Example: "gov.irs.credits.ctc.amount.base" -> "gov/irs/credits/ctc/amount/base.yaml"
     file_path = base_path.replace('.', '/')
     
     try:
-        # Try to import the yaml file from policyengine_us
-        from importlib.resources import files
-        import policyengine_us.parameters
-        
-        # Get the parameter file content
-        parameter_file = files('policyengine_us.parameters').joinpath(f"{file_path}.yaml")
-        with open(parameter_file, 'r') as file:
-            param_data = yaml.safe_load(file)
-            
-        return param_data
-    except Exception as e:
-        # If can't load the file, return basic info
-        return {
-            "description": f"Parameter at {parameter_path}",
-            "metadata": {
-                "reference": []
-            }
-        }
+        # Get the parameter file content from policyengine_us
+        with _parameter_root().joinpath(f"{file_path}.yaml").open('r') as file:
+            return yaml.load(file, Loader=_YAML_LOADER)
+    except FileNotFoundError:
+        # Only a missing file is a stable result worth caching; other errors propagate
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _parameter_root():
+    """
+    Locate the policyengine_us parameters directory, importing the package on first use.
+    
+    Kept lazy so that importing this module does not pull in policyengine_us.
+    
+    Returns:
+        importlib.resources.abc.Traversable: The parameters package root
+    """
+    from importlib.resources import files
+    return files('policyengine_us.parameters')
 
 
 def parse_policy_reform(reform_dict):
@@ -107,18 +327,20 @@ def parse_policy_reform(reform_dict):
         # Get parameter metadata
         param_info = get_parameter_info(param_path)
         
+        # Split the path once for both the name and the policy area
+        path_parts = param_path.split('.')
+        
         # Extract parameter name (last part of the path)
-        param_name = param_path.split('.')[-1]
-        if '[' in param_name:
-            param_name = param_name.split('[')[0]
+        param_name = path_parts[-1].partition('[')[0]
         
         # Extract policy area (first few parts of the path)
-        path_parts = param_path.split('.')
         policy_area = '.'.join(path_parts[:3]) if len(path_parts) >= 3 else path_parts[0]
         
         # Extract change information
         for date_range, new_value in changes.items():
-            start_date, end_date = date_range.split('.')
+            start_date, separator, end_date = date_range.partition('.')
+            if not separator or '.' in end_date:
+                raise ValueError(f"Invalid date range {date_range!r}")
             
             reforms_info.append({
                 "parameter": param_path,
@@ -141,20 +363,72 @@ def format_date_values(obj):
         obj: A dictionary, list, or other object that might contain date values
         
     Returns:
-        The same structure with date objects converted to strings
+        The same structure with date objects converted to strings; the object itself
+        if it contains no dates
+    """
+    # Most structures are already JSON-ready, so check before copying anything
+    if not _has_dates(obj):
+        return obj
+    return _convert_dates(obj)
+
+
+def _has_dates(obj):
     """
-    import datetime
+    Check whether a nested structure contains any date keys or values.
     
+    Args:
+        obj: A dictionary, list, or other object that might contain date values
+        
+    Returns:
+        bool: True as soon as a date is found
+    """
+    if isinstance(obj, datetime.date):
+        return True
     if isinstance(obj, dict):
-        return {str(k) if isinstance(k, datetime.date) else k: format_date_values(v) 
+        return any(isinstance(k, datetime.date) or _has_dates(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return any(_has_dates(item) for item in obj)
+    return False
+
+
+def _convert_dates(obj):
+    """
+    Recursively copy a nested structure, converting date keys and values to strings.
+    
+    Args:
+        obj: A dictionary, list, or other object that might contain date values
+        
+    Returns:
+        The converted copy
+    """
+    if isinstance(obj, dict):
+        return {str(k) if isinstance(k, datetime.date) else k: _convert_dates(v) 
                 for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [format_date_values(item) for item in obj]
+        return [_convert_dates(item) for item in obj]
     elif isinstance(obj, tuple):
-        return tuple(format_date_values(item) for item in obj)
+        return tuple(_convert_dates(item) for item in obj)
     elif isinstance(obj, set):
-        return {format_date_values(item) for item in obj}
+        return {_convert_dates(item) for item in obj}
     elif isinstance(obj, datetime.date):
         return obj.isoformat()  # Convert date to string
     else:
-        return obj
\ No newline at end of file
+        return obj
+
+
+def format_json(obj):
+    """
+    Serialize a structure that may contain date keys or values as compact JSON text.
+    
+    Uses orjson when installed, which converts dates (including dict keys) in a single
+    C pass; otherwise converts dates with format_date_values and uses the json module.
+    
+    Args:
+        obj: A dictionary, list, or other object that might contain date values
+        
+    Returns:
+        str: JSON text with dates as ISO strings
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(format_date_values(obj), default=str, separators=(',', ':'))
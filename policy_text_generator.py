@@ -2,6 +2,53 @@
 """
 Functions for generating plain English text descriptions of policy reforms.
 """
+import functools
+
+from policy_parser import get_parameter_info, load_parameter_info, format_json
+
+# Description template categories, in the order _classify_parameter tests them
+_CTC_BASE, _EITC_AGE, _EITC_INVESTMENT_INCOME, _THRESHOLD, _RATE, _OTHER = range(6)
+
+# Description builders indexed by category, taking (subject, value, start_date, end_date);
+# f-strings are compiled once here instead of str.format parsing a template per reform
+_DESCRIPTION_TEMPLATES = (
+    lambda subject, value, start, end: f"Change the Child Tax Credit amount to {value} from {start} to {end}.",
+    lambda subject, value, start, end: f"Change the EITC {subject} eligibility age to {value} from {start} to {end}.",
+    lambda subject, value, start, end: f"Change the maximum investment income for EITC eligibility to {value} from {start} to {end}.",
+    lambda subject, value, start, end: f"Change the {subject} threshold to {value} from {start} to {end}.",
+    lambda subject, value, start, end: f"Change the {subject} rate to {value} from {start} to {end}.",
+    lambda subject, value, start, end: f"Change {subject} to {value} from {start} to {end}.",
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_parameter(parameter, name):
+    """
+    Pick the description template category for a parameter.
+    
+    Cached, so each distinct parameter is only run through the substring tests once.
+    
+    Args:
+        parameter (str): The parameter path from the reform dict
+        name (str): The parameter name, without any bracket suffix
+        
+    Returns:
+        int: The template category
+    """
+    if "ctc.amount.base" in parameter:
+        return _CTC_BASE
+    if "eitc" in parameter:
+        if "age" in parameter:
+            return _EITC_AGE
+        if "investment_income" in parameter:
+            return _EITC_INVESTMENT_INCOME
+    
+    if "threshold" in name:
+        return _THRESHOLD
+    if "rate" in name:
+        return _RATE
+    return _OTHER
+
 
 def generate_policy_text(reform_info):
     """
@@ -16,76 +63,142 @@ def generate_policy_text(reform_info):
     if not reform_info:
         return "No policy changes were identified."
     
-    text_descriptions = []
-    
     # Group reforms by policy area for better organization
     policy_areas = {}
     for reform in reform_info:
-        area = reform["policy_area"]
-        if area not in policy_areas:
-            policy_areas[area] = []
-        policy_areas[area].append(reform)
-    
-    # Generate descriptions for each reform by policy area
-    for area, reforms in policy_areas.items():
-        area_descriptions = []
-        
+        policy_areas.setdefault(reform["policy_area"], []).append(reform)
+    
+    # Generate descriptions for each reform by policy area, with append bound once
+    # outside the loop
+    text_descriptions = []
+    add_description = text_descriptions.append
+    for reforms in policy_areas.values():
         for reform in reforms:
-            # Format the monetary values with commas and dollar signs if applicable
-            value_str = str(reform["new_value"])
-            if isinstance(reform["new_value"], (int, float)) and reform["new_value"] >= 1000:
-                value_str = f"${reform['new_value']:,}"
+            category = _classify_parameter(reform["parameter"], reform["name"])
+            new_value = reform["new_value"]
+            is_number = isinstance(new_value, (int, float))
             
-            # Create a description based on the reform type
-            if "ctc.amount.base" in reform["parameter"]:
-                description = (
-                    f"Change the Child Tax Credit amount to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
-            elif "eitc" in reform["parameter"] and "age" in reform["parameter"]:
-                description = (
-                    f"Change the EITC {reform['name']} eligibility age to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
-            elif "eitc" in reform["parameter"] and "investment_income" in reform["parameter"]:
-                description = (
-                    f"Change the maximum investment income for EITC eligibility to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
-            elif "threshold" in reform["name"]:
-                description = (
-                    f"Change the {reform['description']} threshold to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
-            elif "rate" in reform["name"]:
-                # Format percentage values
-                if isinstance(reform["new_value"], (int, float)) and reform["new_value"] <= 1:
-                    value_str = f"{reform['new_value'] * 100}%"
-                description = (
-                    f"Change the {reform['description']} rate to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
+            # Format the monetary values with commas and dollar signs if applicable,
+            # and rates as percentages
+            if category == _RATE and is_number and new_value <= 1:
+                value_str = f"{new_value * 100}%"
+            elif is_number and new_value >= 1000:
+                value_str = f"${new_value:,}"
             else:
-                description = (
-                    f"Change {reform['description'] or reform['parameter']} to {value_str} "
-                    f"from {reform['start_date']} to {reform['end_date']}."
-                )
+                value_str = str(new_value)
+            
+            # The EITC age template names the parameter; the others use its description
+            if category == _EITC_AGE:
+                subject = reform["name"]
+            elif category == _OTHER:
+                subject = reform["description"] or reform["parameter"]
+            else:
+                subject = reform["description"]
+            description = _DESCRIPTION_TEMPLATES[category](
+                subject, value_str, reform["start_date"], reform["end_date"]
+            )
             
             # Add reference information if available
             if reform["references"]:
                 ref_titles = [ref.get("title", "Unknown reference") for ref in reform["references"]]
                 description += f" This modifies {', '.join(ref_titles)}."
             
-            area_descriptions.append(description)
-        
-        # Add all descriptions for this policy area
-        text_descriptions.extend(area_descriptions)
+            add_description(f"- {description}")
     
     # Combine all descriptions
     if len(text_descriptions) == 1:
-        full_text = "This policy reform includes the following change:\n\n"
+        header = "This policy reform includes the following change:\n"
     else:
-        full_text = f"This policy reform includes the following {len(text_descriptions)} changes:\n\n"
-    full_text += "\n".join(f"- {desc}" for desc in text_descriptions)
+        header = f"This policy reform includes the following {len(text_descriptions)} changes:\n"
+    text_descriptions.insert(0, header)
+    
+    return "\n".join(text_descriptions)
+
+
+def generate_parameter_context(param_path, new_value, start_date, end_date):
+    """
+    Generate the prompt context describing one modified parameter and its proposed change.
+    
+    Args:
+        param_path (str): The parameter path from the reform dict
+        new_value: The proposed value
+        start_date (str): Start of the period the change applies to
+        end_date (str): End of the period the change applies to
+        
+    Returns:
+        str: Context text for the parameter, ending with a blank line
+    """
+    try:
+        description = _describe_parameter(param_path)
+    except Exception:
+        # The parameter file could not be read this time; describe it without caching,
+        # so the next call tries the file again
+        description = _format_parameter_description(param_path, get_parameter_info(param_path))
+    
+    # The proposed value comes straight from the reform and may be unhashable (a list)
+    # or compare equal to a different value (True == 1), so only the parameter part is cached
+    return f"{description}Proposed change: {new_value} (effective {start_date} to {end_date})\n\n"
+
+
+@functools.lru_cache(maxsize=2048)
+def _describe_parameter(param_path):
+    """
+    Describe a parameter for the prompt context.
+    
+    Results are cached, since popular parameters recur across reforms and sessions.
+    Errors reading the parameter file propagate, so they are not cached.
+    
+    Args:
+        param_path (str): The parameter path from the reform dict
+        
+    Returns:
+        str: Context text for the parameter, without the proposed change
+    """
+    return _format_parameter_description(param_path, load_parameter_info(param_path))
+
+
+def _format_parameter_description(param_path, param_info):
+    """
+    Describe a parameter's current values, type and legal references for the prompt context.
+    
+    Args:
+        param_path (str): The parameter path from the reform dict
+        param_info (dict): The parameter information from get_parameter_info
+        
+    Returns:
+        str: Context text for the parameter, without the proposed change
+    """
+    # Add parameter path and description
+    context_parts = [f"Parameter: {param_path}\n"]
+    if "description" in param_info:
+        context_parts.append(f"Description: {param_info['description']}\n")
+    
+    # Add current values information
+    if "brackets" in param_info:
+        context_parts.append("Current brackets:\n")
+        for bracket in param_info["brackets"]:
+            # Convert date objects to strings in thresholds and amounts
+            threshold_str = format_json(bracket.get('threshold', {}))
+            amount_str = format_json(bracket.get('amount', {}))
+            context_parts.append(f"- Threshold: {threshold_str}\n")
+            context_parts.append(f"  Amount: {amount_str}\n")
+    elif "values" in param_info:
+        # Convert date objects to strings in values
+        values_str = format_json(param_info['values'])
+        context_parts.append(f"Current values: {values_str}\n")
+    
+    # Add metadata
+    if "metadata" in param_info and "type" in param_info["metadata"]:
+        context_parts.append(f"Type: {param_info['metadata']['type']}\n")
+    
+    # Add references
+    if "metadata" in param_info and "reference" in param_info["metadata"]:
+        context_parts.append("Legal references:\n")
+        for ref in param_info["metadata"]["reference"]:
+            if "title" in ref:
+                context_parts.append(f"- {ref['title']}")
+                if "href" in ref:
+                    context_parts.append(f" ({ref['href']})")
+                context_parts.append("\n")
     
-    return full_text
\ No newline at end of file
+    return "".join(context_parts)
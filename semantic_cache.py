@@ -0,0 +1,191 @@
+# semantic_cache.py
+"""
+Embedding-based cache that reuses LLM completions for near-duplicate prompts.
+"""
+import functools
+import os
+import re
+import threading
+
+import numpy as np
+from openai import OpenAIError
+
+import llm_cache
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.92  # Minimum cosine similarity for two prompts to count as duplicates
+INDEX_PATH = os.path.join(llm_cache.CACHE_DIR, "semantic_index.npz")
+
+# Numbers such as "2,500", "2500" or "7.5"; prompts must agree on these to share a completion
+_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def _prompt_numbers(prompt):
+    """
+    Get the numbers mentioned in a prompt, normalised so "2,500" and "2500" match.
+
+    Args:
+        prompt (str): The user prompt
+
+    Returns:
+        str: The numbers in order of appearance, separated by spaces
+    """
+    return " ".join(number.replace(',', '') for number in _NUMBER_RE.findall(prompt))
+
+
+class SemanticCache:
+    """
+    Completions indexed by the normalised embedding of their user prompt.
+
+    Lookups are an exact inner-product search over all stored embeddings. A stored
+    completion is only reused when the prompts are at least SIMILARITY_THRESHOLD
+    similar, were sent with the same system prompt, model and options, and mention
+    the same numbers, so that "$2,500" is never answered with a draft for "$3,000".
+    """
+
+    def __init__(self, client, path=INDEX_PATH):
+        """
+        Args:
+            client (OpenAI): Client used to embed prompts
+            path (str): File the index is persisted to
+        """
+        self._client = client
+        self._path = path
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._namespaces = []
+        self._numbers = []
+        self._texts = []
+
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as index:
+                self._vectors = index["vectors"]
+                self._namespaces = index["namespaces"].tolist()
+                self._numbers = index["numbers"].tolist()
+                self._texts = index["texts"].tolist()
+
+    def embed(self, text):
+        """
+        Embed a prompt as a unit-length vector.
+
+        Args:
+            text (str): The text to embed
+
+        Returns:
+            numpy.ndarray: The normalised embedding
+        """
+        response = self._client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def lookup(self, vector, namespace, numbers):
+        """
+        Find the stored completion for the most similar matching prompt.
+
+        Args:
+            vector (numpy.ndarray): Normalised embedding of the new prompt
+            namespace (str): Identifies the system prompt, model and options
+            numbers (str): Normalised numbers mentioned in the new prompt
+
+        Returns:
+            str or None: The cached completion, or None if no prompt is similar enough
+        """
+        with self._lock:
+            if self._vectors is None:
+                return None
+            similarities = self._vectors @ vector
+            for index in np.argsort(similarities)[::-1]:
+                if similarities[index] < SIMILARITY_THRESHOLD:
+                    return None
+                if self._namespaces[index] == namespace and self._numbers[index] == numbers:
+                    return self._texts[index]
+            return None
+
+    def add(self, vector, namespace, numbers, text):
+        """
+        Store a completion and persist the index to disk.
+
+        The whole index, stored texts included, is rewritten on every call. That is
+        fine at the scale of one user's drafts, but would need an append-only store
+        if the index grew to many thousands of entries.
+
+        Args:
+            vector (numpy.ndarray): Normalised embedding of the prompt
+            namespace (str): Identifies the system prompt, model and options
+            numbers (str): Normalised numbers mentioned in the prompt
+            text (str): The completion text
+        """
+        with self._lock:
+            row = vector[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._namespaces.append(namespace)
+            self._numbers.append(numbers)
+            self._texts.append(text)
+
+            # Write to a temporary file first so a crash never leaves a truncated index
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            temp_path = f"{self._path}.tmp.npz"
+            np.savez(
+                temp_path,
+                vectors=self._vectors,
+                namespaces=np.array(self._namespaces),
+                numbers=np.array(self._numbers),
+                texts=np.array(self._texts),
+            )
+            os.replace(temp_path, self._path)
+
+    def wrap(self, completion_func):
+        """
+        Wrap a cached completion function so near-duplicate prompts reuse earlier completions.
+
+        Args:
+            completion_func (callable): A function decorated with llm_cache.cached_completion
+
+        Returns:
+            callable: A function with the same signature, returning an iterator of text chunks
+        """
+        @functools.wraps(completion_func)
+        def wrapper(system_prompt, user_prompt, model, bypass_cache=False, **options):
+            if not bypass_cache:
+                # An identical prompt needs no embedding call
+                cached_text = llm_cache.get_cached_completion(system_prompt, user_prompt, model, **options)
+                if cached_text is not None:
+                    return iter([cached_text])
+
+            try:
+                vector = self.embed(user_prompt)
+            except OpenAIError:
+                # Drafting does not depend on the embeddings endpoint, so draft without
+                # semantic reuse or indexing this time
+                return completion_func(system_prompt, user_prompt, model, bypass_cache=bypass_cache, **options)
+
+            namespace = llm_cache.make_cache_key(system_prompt, "", model, **options)
+            numbers = _prompt_numbers(user_prompt)
+
+            if not bypass_cache:
+                similar_text = self.lookup(vector, namespace, numbers)
+                if similar_text is not None:
+                    return iter([similar_text])
+
+            chunks = completion_func(system_prompt, user_prompt, model, bypass_cache=bypass_cache, **options)
+            return self._add_when_complete(chunks, vector, namespace, numbers)
+
+        return wrapper
+
+    def _add_when_complete(self, chunks, vector, namespace, numbers):
+        """
+        Pass text chunks through and store the full text once the stream is exhausted,
+        unless it is empty or was cut off at the token limit.
+
+        Yields:
+            str: Each chunk of text as it arrives
+
+        Returns:
+            str or None: The finish reason returned by chunks, if any
+        """
+        parts = []
+        finish_reason = yield from llm_cache.collect_stream(chunks, parts)
+        text = "".join(parts).strip()
+        if llm_cache.is_storable(text, finish_reason):
+            self.add(vector, namespace, numbers, text)
+        return finish_reason
@@ -0,0 +1,96 @@
+# test_llm_cache.py
+"""
+Tests for the on-disk completion cache.
+"""
+import pytest
+
+import llm_cache
+
+
+@pytest.mark.parametrize("text, finish_reason, expected", [
+    ("Bill text", "stop", True),
+    ("Bill text", None, True),
+    ("", "stop", False),
+    ("Bill text", "length", False),
+])
+def test_is_storable(text, finish_reason, expected):
+    assert llm_cache.is_storable(text, finish_reason) is expected
+
+
+def test_collect_stream_returns_finish_reason(fake_stream):
+    parts = []
+    chunks = llm_cache.collect_stream(fake_stream(["a", "b"], "length"), parts)
+    assert next(chunks) == "a"
+    assert next(chunks) == "b"
+    with pytest.raises(StopIteration) as stop:
+        next(chunks)
+    assert stop.value.value == "length"
+    assert parts == ["a", "b"]
+
+
+def test_collect_stream_accepts_plain_iterables():
+    parts = []
+    assert list(llm_cache.collect_stream(["a"], parts)) == ["a"]
+    assert parts == ["a"]
+
+
+def test_options_are_part_of_the_key():
+    assert llm_cache.make_cache_key("sys", "usr", "model") != llm_cache.make_cache_key(
+        "sys", "usr", "model", max_completion_tokens=1000
+    )
+    assert llm_cache.make_cache_key("sys", "usr", "model", max_completion_tokens=1000) != llm_cache.make_cache_key(
+        "sys", "usr", "model", max_completion_tokens=2000
+    )
+
+
+def make_completion(fake_stream, results):
+    """
+    Build a cached completion function that returns the next queued (chunks, finish_reason).
+    """
+    calls = []
+
+    @llm_cache.cached_completion
+    def complete(system_prompt, user_prompt, model, **options):
+        calls.append(options)
+        return fake_stream(*results.pop(0))
+
+    return complete, calls
+
+
+def test_completion_is_cached_once_consumed(stub_cache, fake_stream):
+    complete, calls = make_completion(fake_stream, [(["Bill ", "text "], "stop")])
+
+    assert "".join(complete("sys", "usr", "model")) == "Bill text "
+    assert "".join(complete("sys", "usr", "model")) == "Bill text"
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("chunks, finish_reason", [
+    ([], "stop"),
+    (["  "], "stop"),
+    (["Partial bill"], "length"),
+])
+def test_empty_or_truncated_completion_is_not_cached(stub_cache, fake_stream, chunks, finish_reason):
+    complete, calls = make_completion(fake_stream, [(chunks, finish_reason), (["Bill"], "stop")])
+
+    "".join(complete("sys", "usr", "model"))
+    assert stub_cache.entries == {}
+    assert "".join(complete("sys", "usr", "model")) == "Bill"
+    assert len(calls) == 2
+
+
+def test_bypass_cache_replaces_entry(stub_cache, fake_stream):
+    complete, calls = make_completion(fake_stream, [(["Old"], "stop"), (["New"], "stop")])
+
+    "".join(complete("sys", "usr", "model"))
+    assert "".join(complete("sys", "usr", "model", bypass_cache=True)) == "New"
+    assert "".join(complete("sys", "usr", "model")) == "New"
+    assert len(calls) == 2
+
+
+def test_options_are_passed_through_and_keyed(stub_cache, fake_stream):
+    complete, calls = make_completion(fake_stream, [(["Short"], "stop"), (["Long"], "stop")])
+
+    assert "".join(complete("sys", "usr", "model", max_completion_tokens=1000)) == "Short"
+    assert "".join(complete("sys", "usr", "model", max_completion_tokens=2000)) == "Long"
+    assert calls == [{"max_completion_tokens": 1000}, {"max_completion_tokens": 2000}]
@@ -0,0 +1,103 @@
+# test_policy_parser.py
+"""
+Tests for extracting and parsing the reform dictionary from PolicyEngine code.
+"""
+import pytest
+
+from policy_parser import extract_reform_dict_from_code, parse_policy_reform
+
+
+def test_indented_example():
+    # The example shown in the app is indented and followed by simulation code
+    code = """
+    from policyengine_core.reforms import Reform
+
+    reform = Reform.from_dict({
+    "gov.irs.credits.eitc.eligibility.age.min": {
+        "2025-01-01.2100-12-31": 19
+    }
+    }, country_id="us")
+
+    baseline = Microsimulation()
+    """
+    assert extract_reform_dict_from_code(code) == {
+        "gov.irs.credits.eitc.eligibility.age.min": {"2025-01-01.2100-12-31": 19}
+    }
+
+
+def test_brackets_inside_strings():
+    code = 'reform = Reform.from_dict({"a.b": {"2025-01-01.2100-12-31": "(x]"}, \'c)\': {}}, country_id="us")'
+    assert extract_reform_dict_from_code(code) == {"a.b": {"2025-01-01.2100-12-31": "(x]"}, "c)": {}}
+
+
+def test_comment_inside_dict():
+    code = """reform = Reform.from_dict({
+        # Raise the minimum age ) for childless workers
+        "a.b": {"2025-01-01.2100-12-31": 19},  # was 25 (
+    }, country_id="us")
+    """
+    assert extract_reform_dict_from_code(code) == {"a.b": {"2025-01-01.2100-12-31": 19}}
+
+
+def test_prefix_in_comment_and_string_is_skipped():
+    code = '''
+    # build it with Reform.from_dict(d, country_id)
+    """Docstring mentioning Reform.from_dict(x)"""
+    reform = Reform.from_dict({"a.b": {"2025-01-01.2100-12-31": 1}}, country_id="us")
+    '''
+    assert extract_reform_dict_from_code(code) == {"a.b": {"2025-01-01.2100-12-31": 1}}
+
+
+def test_commented_out_reform_is_skipped():
+    code = """
+    # reform = Reform.from_dict({"old.parameter": {"2024-01-01.2100-12-31": 1}})
+    reform = Reform.from_dict({"new.parameter": {"2025-01-01.2100-12-31": 2}})
+    """
+    assert extract_reform_dict_from_code(code) == {"new.parameter": {"2025-01-01.2100-12-31": 2}}
+
+
+def test_longer_identifier_is_not_a_match():
+    code = 'reform = MyReform.from_dict({"a.b": {"2025-01-01.2100-12-31": 1}})'
+    with pytest.raises(ValueError, match="Could not find a complete Reform.from_dict"):
+        extract_reform_dict_from_code(code)
+
+
+def test_triple_quoted_string_inside_dict():
+    code = '''Reform.from_dict({"a.b": {"2025-01-01.2100-12-31": """one " ) quote"""}, "c": ""})'''
+    assert extract_reform_dict_from_code(code) == {"a.b": {"2025-01-01.2100-12-31": 'one " ) quote'}, "c": ""}
+
+
+def test_module_qualified_call():
+    code = 'reform = reforms.Reform.from_dict({"a.b": {"2025-01-01.2100-12-31": 1}})'
+    assert extract_reform_dict_from_code(code) == {"a.b": {"2025-01-01.2100-12-31": 1}}
+
+
+@pytest.mark.parametrize("code", [
+    "reform = Reform.from_dict(parameters, country_id='us')",
+    "reform = Reform.from_dict({'a.b': {'2025-01-01.2100-12-31': float('inf')}})",
+])
+def test_non_literal_dict_is_reported_plainly(code):
+    with pytest.raises(ValueError, match="must be a literal dict") as error:
+        extract_reform_dict_from_code(code)
+    assert "ast." not in str(error.value)
+
+
+@pytest.mark.parametrize("code", [
+    "baseline = Microsimulation()",
+    "reform = Reform.from_dict({'a.b': {",
+])
+def test_missing_or_incomplete_call(code):
+    with pytest.raises(ValueError, match="Could not find a complete Reform.from_dict"):
+        extract_reform_dict_from_code(code)
+
+
+def test_date_range_is_split_into_start_and_end():
+    reform_info = parse_policy_reform({"a.b[0]": {"2025-01-01.2100-12-31": 1}})
+    assert reform_info[0]["name"] == "b"
+    assert (reform_info[0]["start_date"], reform_info[0]["end_date"]) == ("2025-01-01", "2100-12-31")
+
+
+@pytest.mark.parametrize("date_range", ["2025-01-01", "2025-01-01.2026-01-01.2027-01-01"])
+def test_malformed_date_range_is_rejected(date_range):
+    with pytest.raises(ValueError, match="Invalid date range"):
+        parse_policy_reform({"a.b": {date_range: 1}})
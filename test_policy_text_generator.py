@@ -0,0 +1,77 @@
+# test_policy_text_generator.py
+"""
+Tests for the prompt context generated for modified parameters.
+"""
+import pytest
+
+import policy_parser
+import policy_text_generator
+from policy_text_generator import generate_parameter_context
+
+
+@pytest.fixture
+def parameter_files(tmp_path, monkeypatch):
+    """
+    Serve parameter files from a temporary directory, with empty caches.
+    """
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "b.yaml").write_text("description: Real description\nvalues:\n  2024-01-01: 5\n")
+    monkeypatch.setattr(policy_parser, "_parameter_root", lambda: tmp_path)
+    policy_parser._load_parameter_file.cache_clear()
+    policy_text_generator._describe_parameter.cache_clear()
+    yield tmp_path
+    policy_parser._load_parameter_file.cache_clear()
+    policy_text_generator._describe_parameter.cache_clear()
+
+
+def test_transient_load_failure_is_not_cached(parameter_files, monkeypatch):
+    def failing_root():
+        raise ImportError("policyengine_us is partially imported")
+
+    monkeypatch.setattr(policy_parser, "_parameter_root", failing_root)
+    assert "Description: Parameter at a.b" in generate_parameter_context("a.b", 6, "2025-01-01", "2100-12-31")
+
+    monkeypatch.setattr(policy_parser, "_parameter_root", lambda: parameter_files)
+    context = generate_parameter_context("a.b", 6, "2025-01-01", "2100-12-31")
+    assert "Description: Real description" in context
+    assert 'Current values: {"2024-01-01":5}' in context
+
+
+def test_missing_file_uses_fallback(parameter_files):
+    context = generate_parameter_context("x.y", 1, "2025-01-01", "2100-12-31")
+    assert "Description: Parameter at x.y" in context
+
+
+@pytest.mark.parametrize("new_value, expected", [
+    (1, "Proposed change: 1 "),
+    (True, "Proposed change: True "),
+    (["employment_income"], "Proposed change: ['employment_income'] "),
+])
+def test_proposed_value_is_not_cached(parameter_files, new_value, expected):
+    generate_parameter_context("a.b", 1, "2025-01-01", "2100-12-31")
+    assert expected in generate_parameter_context("a.b", new_value, "2025-01-01", "2100-12-31")
+
+
+def test_context_lists_brackets_type_and_references(parameter_files):
+    (parameter_files / "c.yaml").write_text(
+        "description: Credit schedule\n"
+        "brackets:\n"
+        "  - threshold:\n      2024-01-01: 0\n    amount:\n      2024-01-01: 100\n"
+        "metadata:\n"
+        "  type: single_amount\n"
+        "  reference:\n"
+        "    - title: 26 USC 24\n      href: https://example.org/24\n"
+        "    - title: 26 USC 32\n"
+    )
+    assert generate_parameter_context("c", 200, "2025-01-01", "2100-12-31") == (
+        "Parameter: c\n"
+        "Description: Credit schedule\n"
+        "Current brackets:\n"
+        '- Threshold: {"2024-01-01":0}\n'
+        '  Amount: {"2024-01-01":100}\n'
+        "Type: single_amount\n"
+        "Legal references:\n"
+        "- 26 USC 24 (https://example.org/24)\n"
+        "- 26 USC 32\n"
+        "Proposed change: 200 (effective 2025-01-01 to 2100-12-31)\n\n"
+    )
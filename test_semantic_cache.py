@@ -0,0 +1,90 @@
+# test_semantic_cache.py
+"""
+Tests for reusing completions across near-duplicate prompts.
+"""
+from types import SimpleNamespace
+
+from openai import OpenAIError
+
+import llm_cache
+from semantic_cache import SemanticCache, _prompt_numbers
+
+
+class FakeEmbeddings:
+    """
+    Embeds every prompt as the same vector, so any two prompts count as similar.
+    """
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def create(self, model, input):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0, 0.0])])
+
+
+def make_cache(tmp_path, error=None):
+    embeddings = FakeEmbeddings(error)
+    client = SimpleNamespace(embeddings=embeddings)
+    return SemanticCache(client, path=str(tmp_path / "index.npz")), embeddings
+
+
+def counting_completion(texts, fake_stream):
+    """
+    Build a cached completion function that records how often the model was called.
+    """
+    calls = []
+
+    @llm_cache.cached_completion
+    def complete(system_prompt, user_prompt, model):
+        calls.append(user_prompt)
+        return fake_stream([texts[user_prompt]])
+
+    return complete, calls
+
+
+def test_exact_hit_skips_embedding(stub_cache, fake_stream, tmp_path):
+    cache, embeddings = make_cache(tmp_path)
+    complete, calls = counting_completion({"Set the credit to $2,500": "Bill"}, fake_stream)
+    draft = cache.wrap(complete)
+
+    assert "".join(draft("sys", "Set the credit to $2,500", "model")) == "Bill"
+    assert embeddings.calls == 1
+
+    assert "".join(draft("sys", "Set the credit to $2,500", "model")) == "Bill"
+    assert embeddings.calls == 1
+    assert len(calls) == 1
+
+
+def test_similar_prompt_reuses_draft_only_with_same_numbers(stub_cache, fake_stream, tmp_path):
+    cache, _ = make_cache(tmp_path)
+    complete, calls = counting_completion({
+        "Set the credit to $2,500": "Bill A",
+        "Please set the credit to $2500": "Bill B",
+        "Set the credit to $3,000": "Bill C",
+    }, fake_stream)
+    draft = cache.wrap(complete)
+
+    "".join(draft("sys", "Set the credit to $2,500", "model"))
+    assert "".join(draft("sys", "Please set the credit to $2500", "model")) == "Bill A"
+    assert "".join(draft("sys", "Set the credit to $3,000", "model")) == "Bill C"
+    assert calls == ["Set the credit to $2,500", "Set the credit to $3,000"]
+
+
+def test_embedding_failure_falls_back_to_completion(stub_cache, fake_stream, tmp_path):
+    cache, _ = make_cache(tmp_path, error=OpenAIError("embeddings unavailable"))
+    complete, calls = counting_completion({"Set the credit to $2,500": "Bill"}, fake_stream)
+
+    assert "".join(cache.wrap(complete)("sys", "Set the credit to $2,500", "model")) == "Bill"
+    assert calls == ["Set the credit to $2,500"]
+    assert not (tmp_path / "index.npz").exists()
+
+
+def test_prompt_numbers_ignore_thousands_separators():
+    assert _prompt_numbers("Set the credit to $2,500 in 2025") == "2500 2025"
+    assert _prompt_numbers("Set the credit to $2500 in 2025") == _prompt_numbers("Set the credit to $2,500 in 2025")
+    assert _prompt_numbers("Raise the rate to 7.5%") == "7.5"
+    assert _prompt_numbers("Set the credit to $3,000") != _prompt_numbers("Set the credit to $2,500")